@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from enum import IntEnum, auto
+from functools import lru_cache
 from types import SimpleNamespace
-from typing import Union, List, Dict
+from typing import Union, List, Dict, FrozenSet, Iterator, Match, Tuple, Type
 import re
 
 
@@ -9,12 +10,16 @@ class Directive:
     def __init__(
         self, pattern: str, replacement: str,
         name: Union[str, None] = None,
-        flags: int = 0
+        flags: int = 0,
+        literal: Union[str, None] = None
     ):
         self.pattern = pattern
         self.replacement = replacement
         self.name = name
         self.flags = flags
+        self.compiled = re.compile(pattern, flags)
+        # the text matched by the pattern, if it can be substituted with str.replace()
+        self.literal = literal
 
 
 # https://www.sphinx-doc.org/en/master/usage/restructuredtext/domains.html#cross-referencing-python-objects
@@ -219,7 +224,8 @@ ADMONITION_DIRECTIVES: List[Directive] = [
     # https://docutils.sourceforge.io/docs/ref/rst/directives.html#admonitions
     Directive(
         pattern=rf'\.\. {admonition.name}::',
-        replacement=admonition.inline_markdown
+        replacement=admonition.inline_markdown,
+        literal=f'.. {admonition.name}::'
     )
     for admonition in ADMONITIONS
 ]
@@ -322,27 +328,99 @@ ESCAPING_RULES: List[Directive] = [
 ]
 
 
+_DIRECTIVES_BY_NAME: Dict[str, Directive] = {
+    directive.name: directive
+    for directive in RST_DIRECTIVES
+    if directive.name
+}
+
+
 def _find_directive_pattern(name: str):
-    return [
-        directive for directive in RST_DIRECTIVES
-        if directive.name == name
-    ][0].pattern
+    return _DIRECTIVES_BY_NAME[name].pattern
 
 
 HIGHLIGHT_PATTERN = _find_directive_pattern('highlight')
 CODE_BLOCK_PATTERN = _find_directive_pattern('code-block')
 
+_HIGHLIGHT_RE = re.compile(HIGHLIGHT_PATTERN)
+_CODE_BLOCK_RE = re.compile(CODE_BLOCK_PATTERN)
+_DOUBLE_COLON_BLOCK_RE = re.compile(r'(\s|\w)::\n')
+
+
+_INLINE_FLAGS = {
+    re.IGNORECASE: 'i',
+    re.MULTILINE: 'm',
+    re.DOTALL: 's',
+    re.VERBOSE: 'x'
+}
+
+
+class _DirectiveAlternation:
+    """A single-scan check whether any of the directives matches, done before the per-directive passes.
+
+    The named groups and numbered back-references of each directive are
+    rewritten so that they do not clash with the groups of other directives.
+    """
+
+    def __init__(self, directives: List[Directive]):
+        self.directives = directives
+        alternatives = []
+        groups_before = 0
+        for i, directive in enumerate(directives):
+            prefix = f'd{i}_'
+            pattern = re.sub(r'\(\?P<(\w+)>', rf'(?P<{prefix}\1>', directive.pattern)
+            pattern = re.sub(r'\(\?P=(\w+)\)', rf'(?P={prefix}\1)', pattern)
+            # the groups of the preceding directives shift the numbers of groups of this one
+            offset = groups_before
+            pattern = re.sub(
+                r'(?<!\\)\\([1-9]\d*)',
+                lambda match: '\\' + str(int(match.group(1)) + offset),
+                pattern
+            )
+            flags = ''.join(
+                letter
+                for flag, letter in _INLINE_FLAGS.items()
+                if directive.flags & flag
+            )
+            alternatives.append(f'(?{flags}:{pattern})')
+            groups_before += directive.compiled.groups
+        self.compiled = re.compile('|'.join(alternatives))
+
+    def search(self, text: str) -> Union[Match[str], None]:
+        return self.compiled.search(text)
+
+    def sub(self, text: str) -> str:
+        # most of the text has no markup at all, which a single scan can tell
+        if not self.compiled.search(text):
+            return text
+        # otherwise the directives are applied one after another, as the later
+        # ones may need to match the output of the earlier ones (e.g. roles in
+        # seealso) or the text left after the earlier ones removed directives
+        for directive in self.directives:
+            if directive.literal is not None:
+                text = text.replace(directive.literal, directive.replacement)
+            else:
+                text = directive.compiled.sub(directive.replacement, text)
+        return text
+
+
+_COMBINED_RST_DIRECTIVES = _DirectiveAlternation(RST_DIRECTIVES)
+
 
 def looks_like_rst(value: str) -> bool:
     # check if any of the characteristic sections (and the properly formatted underline) is there
     for section in _RST_SECTIONS:
         if (section + '\n' + '-' * len(section) + '\n') in value:
             return True
-    for directive in RST_DIRECTIVES:
-        if re.search(directive.pattern, value, directive.flags):
-            return True
+    if '\n>>> ' in value:
+        return True
+    # all the directives and roles (as well as the double colon) require one of these
+    if ':' not in value and '`' not in value:
+        return False
+    if _COMBINED_RST_DIRECTIVES.search(value):
+        return True
     # allow "text::" or "text ::" but not "^::$" or "^:::$"
-    return bool(re.search(r'(\s|\w)::\n', value) or '\n>>> ' in value)
+    return bool(_DOUBLE_COLON_BLOCK_RE.search(value))
 
 
 class IBlockBeginning(SimpleNamespace):
@@ -352,10 +430,21 @@ class IBlockBeginning(SimpleNamespace):
     remainder: str
 
 
+class LineKind(IntEnum):
+    PLAIN = auto()
+    SECTION = auto()
+    PYTHON_PROMPT = auto()
+    EXPLICIT_MARKUP = auto()
+    DOUBLE_COLON = auto()
+    TABLE_BORDER = auto()
+
+
 class IParser(ABC):
+    __slots__ = ()
 
+    @classmethod
     @abstractmethod
-    def can_parse(self, line: str) -> bool:
+    def can_parse(cls, line: str) -> bool:
         """Whether the line looks like a valid beginning of parsed block."""
 
     @abstractmethod
@@ -380,10 +469,17 @@ class IParser(ABC):
         """Finish parsing and return the converted part of the docstring."""
 
     """Is there another parser that should follow after this parser finished?"""
-    follower: Union['IParser', None] = None
+    follower: Union[Type['IParser'], None] = None
+
+    """Kinds of lines (as classified by their leading and trailing characters) which can begin the block.
+
+    Applies to the `can_parse()` declared alongside; a subclass overriding `can_parse()` alone is asked about any line.
+    """
+    line_kinds: FrozenSet[LineKind] = frozenset(LineKind)
 
 
 class TableParser(IParser):
+    line_kinds = frozenset({LineKind.TABLE_BORDER})
 
     class State(IntEnum):
         AWAITS = auto()
@@ -417,8 +513,9 @@ class TableParser(IParser):
         self._max_sizes = []
         self._indent = ''
 
-    def can_parse(self, line: str) -> bool:
-        return bool(re.match(self.outer_border_pattern, line))
+    @classmethod
+    def can_parse(cls, line: str) -> bool:
+        return bool(re.match(cls.outer_border_pattern, line))
 
     def initiate_parsing(self, line: str, current_language: str) -> IBlockBeginning:
         self._reset_state()
@@ -536,8 +633,9 @@ class GridTableParser(TableParser):
 
 
 class BlockParser(IParser):
+    __slots__ = ('_buffer', '_block_started')
     enclosure = '```'
-    follower: Union['IParser', None] = None
+    follower: Union[Type['IParser'], None] = None
     _buffer: List[str]
     _block_started: bool
 
@@ -545,8 +643,9 @@ class BlockParser(IParser):
         self._buffer = []
         self._block_started = False
 
+    @classmethod
     @abstractmethod
-    def can_parse(self, line: str) -> bool:
+    def can_parse(cls, line: str) -> bool:
         """All children should call _start_block in initiate_parsing() implementation."""
 
     def _start_block(self, language: str):
@@ -560,7 +659,7 @@ class BlockParser(IParser):
 
     def finish_consumption(self, final: bool) -> str:
         # if the last line is empty (e.g. a separator of intended block), discard it
-        if self._buffer[len(self._buffer) - 1].strip() == '':
+        if self._buffer and (not self._buffer[-1] or self._buffer[-1].isspace()):
             self._buffer.pop()
         self._buffer.append(self.enclosure + '\n')
         result = '\n'.join(self._buffer)
@@ -572,6 +671,7 @@ class BlockParser(IParser):
 
 
 class IndentedBlockParser(BlockParser, ABC):
+    __slots__ = ('_is_block_beginning', '_block_indent_size')
     _is_block_beginning: bool
     _block_indent_size: Union[int, None]
 
@@ -585,18 +685,18 @@ class IndentedBlockParser(BlockParser, ABC):
         self._is_block_beginning = True
 
     def can_consume(self, line: str) -> bool:
-        if self._is_block_beginning and line.strip() == '':
-            return True
-        return bool((len(line) > 0 and re.match(r'^\s', line[0])) or len(line) == 0)
+        # this includes the whitespace-only lines at the block beginning
+        return not line or line[0].isspace()
 
     def consume(self, line: str):
+        trimmed_line = line.lstrip()
         if self._is_block_beginning:
             # skip the first empty line
             self._is_block_beginning = False
-            if line.strip() == '':
+            if not trimmed_line:
                 return
         if self._block_indent_size is None:
-            self._block_indent_size = len(line) - len(line.lstrip())
+            self._block_indent_size = len(line) - len(trimmed_line)
         super().consume(line[self._block_indent_size:])
 
     def finish_consumption(self, final: bool) -> str:
@@ -606,10 +706,13 @@ class IndentedBlockParser(BlockParser, ABC):
 
 
 class PythonOutputBlockParser(BlockParser):
+    __slots__ = ()
+
     def can_consume(self, line: str) -> bool:
         return line.strip() != '' and not line.startswith('>>>')
 
-    def can_parse(self, line: str) -> bool:
+    @classmethod
+    def can_parse(cls, line: str) -> bool:
         return line.strip() != ''
 
     def initiate_parsing(self, line: str, current_language: str) -> IBlockBeginning:
@@ -619,7 +722,11 @@ class PythonOutputBlockParser(BlockParser):
 
 
 class PythonPromptCodeBlockParser(BlockParser):
-    def can_parse(self, line: str) -> bool:
+    __slots__ = ()
+    line_kinds = frozenset({LineKind.PYTHON_PROMPT})
+
+    @classmethod
+    def can_parse(cls, line: str) -> bool:
         return line.startswith('>>>')
 
     def initiate_parsing(self, line: str, current_language: str) -> IBlockBeginning:
@@ -628,21 +735,23 @@ class PythonPromptCodeBlockParser(BlockParser):
         return IBlockBeginning(remainder='')
 
     def can_consume(self, line: str) -> bool:
-        return line.startswith('>>>') or line.startswith('...')
+        return line.startswith(('>>>', '...'))
 
     def consume(self, line: str):
         super().consume(self._strip_prompt(line))
 
     def _strip_prompt(self, line: str) -> str:
-        start = 4 if line.startswith('>>> ') or line.startswith('... ') else 3
-        return line[start:]
+        return line[4:] if line.startswith(('>>> ', '... ')) else line[3:]
 
-    follower = PythonOutputBlockParser()
+    follower = PythonOutputBlockParser
 
 
 class DoubleColonBlockParser(IndentedBlockParser):
+    __slots__ = ()
+    line_kinds = frozenset({LineKind.PYTHON_PROMPT, LineKind.EXPLICIT_MARKUP, LineKind.DOUBLE_COLON})
 
-    def can_parse(self, line: str):
+    @classmethod
+    def can_parse(cls, line: str):
         # note: Python uses ' ::' but numpy uses just '::'
         return line.rstrip().endswith('::')
 
@@ -652,16 +761,22 @@ class DoubleColonBlockParser(IndentedBlockParser):
             language = ''
             line = ''
         else:
-            line = re.sub(r'::$', '', line)
+            # can_parse() allows for trailing whitespace after the double colon
+            line = line.rstrip()
+            if line.endswith('::'):
+                line = line[:-2]
 
         self._start_block(language)
         return IBlockBeginning(remainder=line.rstrip() + '\n\n')
 
 
 class MathBlockParser(IndentedBlockParser):
+    __slots__ = ()
+    line_kinds = frozenset({LineKind.EXPLICIT_MARKUP})
     enclosure = '$$'
 
-    def can_parse(self, line: str):
+    @classmethod
+    def can_parse(cls, line: str):
         return line.strip() == '.. math::'
 
     def initiate_parsing(self, line: str, current_language: str):
@@ -670,14 +785,17 @@ class MathBlockParser(IndentedBlockParser):
 
 
 class NoteBlockParser(IndentedBlockParser):
+    __slots__ = ()
+    line_kinds = frozenset({LineKind.EXPLICIT_MARKUP})
     enclosure = '\n---'
     directives = {
         f'.. {admonition.name}::': admonition
         for admonition in ADMONITIONS
     }
 
-    def can_parse(self, line: str):
-        return line.strip() in self.directives
+    @classmethod
+    def can_parse(cls, line: str):
+        return line.strip() in cls.directives
 
     def initiate_parsing(self, line: str, current_language: str):
         admonition = self.directives[line.strip()]
@@ -686,38 +804,150 @@ class NoteBlockParser(IndentedBlockParser):
 
 
 class ExplicitCodeBlockParser(IndentedBlockParser):
-    def can_parse(self, line: str) -> bool:
-        return re.match(CODE_BLOCK_PATTERN, line) is not None
+    __slots__ = ()
+    line_kinds = frozenset({LineKind.EXPLICIT_MARKUP})
+
+    @classmethod
+    def can_parse(cls, line: str) -> bool:
+        return _CODE_BLOCK_RE.match(line) is not None
 
     def initiate_parsing(self, line: str, current_language: str) -> IBlockBeginning:
-        match = re.match(CODE_BLOCK_PATTERN, line)
+        match = _CODE_BLOCK_RE.match(line)
         # already checked in can_parse
         assert match
         self._start_block(match.group('language').strip() or current_language)
         return IBlockBeginning(remainder='')
 
 
-BLOCK_PARSERS = [
-    PythonPromptCodeBlockParser(),
-    NoteBlockParser(),
-    MathBlockParser(),
-    ExplicitCodeBlockParser(),
-    DoubleColonBlockParser(),
-    SimpleTableParser(),
-    GridTableParser()
+BLOCK_PARSERS: List[Type[IParser]] = [
+    PythonPromptCodeBlockParser,
+    NoteBlockParser,
+    MathBlockParser,
+    ExplicitCodeBlockParser,
+    DoubleColonBlockParser,
+    SimpleTableParser,
+    GridTableParser
 ]
 
+
+def _line_kinds(parser: Type[IParser]) -> FrozenSet[LineKind]:
+    for parser_class in parser.__mro__:
+        if 'can_parse' in vars(parser_class):
+            kinds: FrozenSet[LineKind] = vars(parser_class).get('line_kinds', frozenset(LineKind))
+            return kinds
+    return frozenset(LineKind)
+
+
+@lru_cache(maxsize=1)
+def _block_parsers_by_kind(parsers: Tuple[Type[IParser], ...]) -> Dict[LineKind, List[Type[IParser]]]:
+    """Candidate parsers for each kind of line, in the order of precedence of given parsers."""
+    parsers_kinds = [(parser, _line_kinds(parser)) for parser in parsers]
+    return {
+        kind: [parser for parser, kinds in parsers_kinds if kind in kinds]
+        for kind in LineKind
+    }
+
+
+def _classify_line(line: str) -> Tuple[LineKind, str]:
+    """Classify the line by its leading and trailing characters, returning the kind and the stripped line."""
+    if line.startswith('>>>'):
+        # nothing to strip on the left
+        return LineKind.PYTHON_PROMPT, line.rstrip()
+    stripped = line.strip()
+    if stripped.startswith('.. '):
+        return LineKind.EXPLICIT_MARKUP, stripped
+    if stripped.endswith('::'):
+        return LineKind.DOUBLE_COLON, stripped
+    if stripped.startswith(('=', '+')):
+        return LineKind.TABLE_BORDER, stripped
+    if stripped in _RST_SECTIONS:
+        return LineKind.SECTION, stripped
+    return LineKind.PLAIN, stripped
+
+
+def _find_block_parser(line: str, candidates: List[Type[IParser]]) -> Union[Type[IParser], None]:
+    for parser in candidates:
+        if parser.can_parse(line):
+            return parser
+    return None
+
+
 RST_SECTIONS = {
     section: '\n' + section + '\n' + '-' * len(section)
     for section in _RST_SECTIONS
 }
 
+_SECTION_HEADERS = {
+    header: '\n#### ' + section + '\n'
+    for (section, header) in RST_SECTIONS.items()
+}
+_SECTION_RE = re.compile('|'.join(
+    re.escape(header)
+    for header in sorted(_SECTION_HEADERS, key=len, reverse=True)
+))
+
 DIRECTIVES = [
     *RST_DIRECTIVES,
     *ESCAPING_RULES
 ]
 
 
+def _starts_with_role(pattern: str) -> bool:
+    # allowing for the beginning of line and an optional domain, e.g. (:py)?
+    return bool(re.match(r'(\^\\s\*)?(\(:\w+\)\?)?:', pattern))
+
+
+_DOTDOT_DIRECTIVES = [
+    directive for directive in DIRECTIVES
+    if directive.pattern.startswith(r'\.\. ')
+]
+_ROLE_DIRECTIVES = [
+    directive for directive in DIRECTIVES
+    if _starts_with_role(directive.pattern)
+]
+
+_ALL_DIRECTIVES = _DirectiveAlternation(DIRECTIVES)
+_DIRECTIVES_WITHOUT_DOTDOT = _DirectiveAlternation([
+    directive for directive in DIRECTIVES
+    if directive not in _DOTDOT_DIRECTIVES
+])
+# the `..` directives all end with `::` so these cannot match without a colon either
+_DIRECTIVES_WITHOUT_COLON = _DirectiveAlternation([
+    directive for directive in DIRECTIVES
+    if directive not in _DOTDOT_DIRECTIVES and directive not in _ROLE_DIRECTIVES
+])
+
+
+_NUMPY_ARGUMENT_RE = re.compile(r'^(?P<indent>\s*)(?P<argument>[^:\s]+) : (?P<type>.+)$')
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """Yield the lines of the text one by one, as in text.split('\\n')."""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def _flush_buffer(lines_buffer: List[str]) -> str:
+    """Convert the rst markup in the buffered lines, emptying the buffer."""
+    lines = '\n'.join(lines_buffer)
+    lines_buffer.clear()
+    # rst markup handling
+    if ':' not in lines:
+        lines = _DIRECTIVES_WITHOUT_COLON.sub(lines)
+    elif '.. ' not in lines:
+        lines = _DIRECTIVES_WITHOUT_DOTDOT.sub(lines)
+    else:
+        lines = _ALL_DIRECTIVES.sub(lines)
+
+    return _SECTION_RE.sub(lambda match: _SECTION_HEADERS[match.group()], lines)
+
+
 def rst_to_markdown(text: str, extract_signature: bool = True) -> str:
     """
     Try to parse docstrings in following formats to markdown:
@@ -743,85 +973,73 @@ def rst_to_markdown(text: str, extract_signature: bool = True) -> str:
         text - the input docstring
     """
     language = 'python'
-    markdown = ''
+    parts: List[str] = []
     active_parser: Union[IParser, None] = None
     lines_buffer: List[str] = []
     most_recent_section: Union[str, None] = None
     is_first_line = True
+    # looked up on each call so that changes to BLOCK_PARSERS are honoured
+    parsers_by_kind = _block_parsers_by_kind(tuple(BLOCK_PARSERS))
 
-    def flush_buffer():
-        nonlocal lines_buffer
-        lines = '\n'.join(lines_buffer)
-        # rst markup handling
-        for directive in DIRECTIVES:
-            lines = re.sub(directive.pattern, directive.replacement, lines, flags=directive.flags)
-
-        for (section, header) in RST_SECTIONS.items():
-            lines = lines.replace(header, '\n#### ' + section + '\n')
-
-        lines_buffer = []
-        return lines
-
-    for line in text.split('\n'):
+    for line in _iter_lines(text):
         if is_first_line:
-            if extract_signature:
-                signature_match = re.match(r'^(?P<name>\S+)\((?P<params>.*)\)$', line)
-                if signature_match and signature_match.group('name').isidentifier():
-                    markdown += '```python\n' + line + '\n```\n'
+            if extract_signature and line.endswith(')') and '(' in line:
+                if line[:line.index('(')].isidentifier():
+                    parts.append('```python\n' + line + '\n```\n')
                     continue
             is_first_line = False
 
-        trimmed_line = line.lstrip()
-
         if active_parser:
             if active_parser.can_consume(line):
                 active_parser.consume(line)
             else:
-                markdown += flush_buffer()
-                markdown += active_parser.finish_consumption(False)
+                parts.append(_flush_buffer(lines_buffer))
+                parts.append(active_parser.finish_consumption(False))
                 follower = active_parser.follower
                 if follower and follower.can_parse(line):
-                    active_parser = follower
+                    active_parser = follower()
                     active_parser.initiate_parsing(line, language)
                 else:
                     active_parser = None
 
         if not active_parser:
+            kind, stripped_line = _classify_line(line)
+
             # we are not in a code block now but maybe we enter start one?
-            for parser in BLOCK_PARSERS:
-                if parser.can_parse(line):
-                    active_parser = parser
-                    block_start = parser.initiate_parsing(line, language)
-                    line = block_start.remainder
-                    break
+            parser_class = _find_block_parser(line, parsers_by_kind[kind])
+            if parser_class:
+                active_parser = parser_class()
+                block_start = active_parser.initiate_parsing(line, language)
+                line = block_start.remainder
 
             # ok, we are not in any code block (it may start with the next line, but this line is clear - or empty)
 
             # lists handling: items detection
             # this one does NOT allow spaces on the left hand side (to avoid false positive matches)
-            match = re.match(r'^(?P<indent>\s*)(?P<argument>[^:\s]+) : (?P<type>.+)$', line)
+            match = _NUMPY_ARGUMENT_RE.match(line)
             if match:
                 line = match.group('indent') + '- `' + match.group('argument') + '`: ' + match.group('type') + ''
             else:
                 if most_recent_section in SECTION_DIRECTIVES:
                     for section_directive in SECTION_DIRECTIVES[most_recent_section]:
-                        if re.match(section_directive.pattern, trimmed_line):
-                            line = re.sub(section_directive.pattern, section_directive.replacement, trimmed_line)
+                        if section_directive.compiled.match(stripped_line):
+                            line = section_directive.compiled.sub(section_directive.replacement, stripped_line)
                             break
-                if trimmed_line.rstrip() in RST_SECTIONS:
-                    most_recent_section = trimmed_line.rstrip()
+                if kind == LineKind.SECTION:
+                    most_recent_section = stripped_line
 
             # change highlight language if requested
             # this should not conflict with the parsers starting above
             # as the highlight directive should be in a line of its own
-            highlight_match = re.search(HIGHLIGHT_PATTERN, line)
-            if highlight_match and highlight_match.group('language').strip() != '':
-                language = highlight_match.group('language').strip()
+            if '.. highlight::' in line:
+                highlight_match = _HIGHLIGHT_RE.search(line)
+                if highlight_match and highlight_match.group('language').strip() != '':
+                    language = highlight_match.group('language').strip()
 
             lines_buffer.append(line)
 
-    markdown += flush_buffer()
+    parts.append(_flush_buffer(lines_buffer))
     # close off the code block - if any
     if active_parser:
-        markdown += active_parser.finish_consumption(True)
-    return markdown
+        parts.append(active_parser.finish_consumption(True))
+    return ''.join(parts)
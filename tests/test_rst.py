@@ -1,6 +1,6 @@
 import pytest
 
-from docstring_to_markdown.rst import looks_like_rst, rst_to_markdown
+from docstring_to_markdown.rst import BLOCK_PARSERS, ExplicitCodeBlockParser, looks_like_rst, rst_to_markdown
 
 
 SEE_ALSO = """
@@ -714,6 +714,10 @@ RST_CASES = {
         'rst': RST_COLON_CODE_BLOCK,
         'md': RST_COLON_CODE_BLOCK_MARKDOWN
     },
+    'converts double colon-initiated code block with trailing whitespace': {
+        'rst': 'the following code:: \n\n    code\n',
+        'md': 'the following code\n\n```python\ncode\n```\n'
+    },
     'converts double colon-initiated code block with different indent and Python prompt': {
         'rst': NUMPY_EXAMPLE,
         'md': NUMPY_EXAMPLE_MARKDOWN
@@ -742,10 +746,22 @@ RST_CASES = {
         'rst': NUMPY_ARGS_PARAMETERS,
         'md': NUMPY_ARGS_PARAMETERS_MARKDOWN
     },
+    'converts numpy-style *args parameters with trailing whitespace': {
+        'rst': 'Parameters\n----------\n*args  \n    Positional.\n',
+        'md': 'Parameters\n----------\n- `*args`\n    Positional.\n'
+    },
     'converts signature in the first line': {
         'rst': INITIAL_SIGNATURE,
         'md': INITIAL_SIGNATURE_MARKDOWN
     },
+    'converts signature with nested parentheses in the first line': {
+        'rst': 'sort(key=dict(), reverse=False)\n\nSort the items.',
+        'md': '```python\nsort(key=dict(), reverse=False)\n```\n\nSort the items.'
+    },
+    'does not convert parenthesised text in the first line': {
+        'rst': 'not a signature (really)',
+        'md': 'not a signature (really)'
+    },
     'separates following paragraph after a code blocks without output': {
         'rst': CODE_BLOCK_BUT_NOT_OUTPUT,
         'md': CODE_BLOCK_BUT_NOT_OUTPUT_MD
@@ -792,6 +808,26 @@ RST_CASES = {
         'rst': ':param x: test arg',
         'md': '- `x`: test arg'
     },
+    'converts sphinx params with types': {
+        'rst': ':param x: test arg\n:type x: int',
+        'md': '- `x` (int): test arg'
+    },
+    'converts cross-references in "see also" directive': {
+        'rst': '.. seealso:: :func:`numpy.fft.fft`',
+        'md': '*See also* `numpy.fft.fft`'
+    },
+    'keeps field-like text within roles': {
+        'rst': 'see :ref:`:returns <x>`',
+        'md': 'see :returns: `x`'
+    },
+    'converts sphinx fields following a removed directive': {
+        'rst': 'text\n\n.. currentmodule:: foo\n:returns: y',
+        'md': 'text\n- returns: y'
+    },
+    'removes consecutive highlight and currentmodule directives': {
+        'rst': 'a\n.. highlight:: R\n.. currentmodule:: foo',
+        'md': 'a\n\n'
+    },
     'converts indented sphinx params': {
         'rst': '\t:param x: test arg',
         'md': '- `x`: test arg'
@@ -860,6 +896,19 @@ def test_integration():
     assert RST_LINK_EXAMPLE_MARKDOWN in converted
 
 
+def test_rst_to_markdown_uses_block_parsers_added_at_runtime(monkeypatch):
+    class CustomCodeBlockParser(ExplicitCodeBlockParser):
+        @classmethod
+        def can_parse(cls, line: str) -> bool:
+            return line == 'XX'
+
+        def initiate_parsing(self, line, current_language):
+            return super().initiate_parsing('.. code-block:: custom', current_language)
+
+    monkeypatch.setattr('docstring_to_markdown.rst.BLOCK_PARSERS', [CustomCodeBlockParser, *BLOCK_PARSERS])
+    assert rst_to_markdown('XX\n    code') == '```custom\ncode\n```\n'
+
+
 @pytest.mark.parametrize(
     'rst,markdown',
     [[case['rst'], case['md']] for case in RST_CASES.values()],